@@ -5,7 +5,15 @@ from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url)
+# Shared by request handlers, background syncs and the scheduler
+engine = create_engine(
+    settings.database_url,
+    pool_size=10,
+    max_overflow=20,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=1800
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -4,8 +4,9 @@ from contextlib import asynccontextmanager
 
 from app.database import engine, Base
 from app.routes import router
+from app.services import icloud_reminders
 from app.services.scheduler import sync_scheduler
-from app.services.sync_service import get_setting
+from app.services.sync_service import get_setting, fail_running_sync_logs
 from app.database import SessionLocal
 
 
@@ -14,19 +15,33 @@ async def lifespan(app: FastAPI):
     # Startup
     Base.metadata.create_all(bind=engine)
     
+    # The scheduler runs on the server's event loop, so it starts here
+    sync_scheduler.start()
+    
     # Start scheduler if previously configured
     db = SessionLocal()
     try:
+        # A sync still marked running was cut short by the last shutdown
+        fail_running_sync_logs(db, "Interrupted by a server restart")
+        
         interval = get_setting(db, "sync_interval_minutes")
         if interval:
             sync_scheduler.start_sync_job(int(interval))
     finally:
         db.close()
     
+    # Request Reminders access up front
+    try:
+        icloud_reminders.warm_up()
+    except Exception as e:
+        print(f"EventKit warm-up failed: {e}")
+    
     yield
     
     # Shutdown
     sync_scheduler.stop_sync_job()
+    sync_scheduler.shutdown()
+    engine.dispose()
 
 
 app = FastAPI(
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -30,13 +31,21 @@ class SyncLog(Base):
     __tablename__ = "sync_logs"
     
     id = Column(Integer, primary_key=True, index=True)
-    status = Column(SQLEnum(SyncStatus), default=SyncStatus.PENDING)
-    direction = Column(SQLEnum(SyncDirection), default=SyncDirection.BIDIRECTIONAL)
+    status = Column(String(16), default=SyncStatus.PENDING.value)
+    direction = Column(String(16), default=SyncDirection.BIDIRECTIONAL.value)
     tasks_synced = Column(Integer, default=0)
     reminders_synced = Column(Integer, default=0)
     error_message = Column(Text, nullable=True)
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    @validates("status")
+    def _validate_status(self, key, value):
+        return SyncStatus(value).value
+    
+    @validates("direction")
+    def _validate_direction(self, key, value):
+        return SyncDirection(value).value
 
 
 class TaskMapping(Base):
@@ -50,6 +59,8 @@ class TaskMapping(Base):
     icloud_calendar_url = Column(Text, nullable=True)
     title = Column(String(500), nullable=False)
     last_known_completed = Column(Boolean, default=False)  # Track last synced completion status
+    last_synced_hash = Column(String(16), nullable=True)  # Fingerprint of the last synced title/notes/due/status
+    gmail_deleted = Column(Boolean, default=False)  # Gmail task was deleted; kept so its reminder isn't re-created
     synced_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
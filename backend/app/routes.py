@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from pydantic import TypeAdapter
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -8,29 +10,42 @@ from app.schemas import (
     GoogleAuthUrl, ICloudCredentials, TaskListResponse, CalendarResponse,
     StatusResponse
 )
-from app.models import SyncLog, SyncStatus, SyncDirection
-from app.services import google_tasks, icloud_reminders
-from app.services.sync_service import get_setting, set_setting, run_sync
+from app.models import SyncLog, SyncDirection, Settings, Credential
+from app.services import google_tasks, icloud_reminders, connection_state
+from app.services.sync_service import get_setting, set_setting, create_sync_log, run_sync_for_log, reset_delta_cursors
 from app.services.scheduler import sync_scheduler
 
 router = APIRouter()
 
+# Validates a whole page of sync logs with one compiled validator
+sync_logs_adapter = TypeAdapter(List[SyncLogResponse])
+
 
 # ============ Status & Settings ============
 
 @router.get("/status", response_model=StatusResponse)
 def get_status(db: Session = Depends(get_db)):
     """Get current sync status and configuration."""
-    last_sync = db.query(SyncLog).order_by(SyncLog.id.desc()).first()
-    interval = int(get_setting(db, "sync_interval_minutes", "15"))
+    # Polled by the dashboard, so gather everything in one round trip
+    last_sync_id, interval, google_connected = db.query(
+        db.query(func.max(SyncLog.id)).scalar_subquery(),
+        db.query(Settings.value).filter(Settings.key == "sync_interval_minutes").scalar_subquery(),
+        db.query(Credential.id).filter(
+            Credential.service == "google",
+            Credential.access_token.isnot(None)
+        ).exists()
+    ).one()
+    last_sync = db.get(SyncLog, last_sync_id) if last_sync_id else None
     
     return StatusResponse(
         scheduler_running=sync_scheduler.is_running(),
         next_sync_at=sync_scheduler.get_next_run_time(),
         last_sync=SyncLogResponse.model_validate(last_sync) if last_sync else None,
-        sync_interval_minutes=interval,
-        google_connected=google_tasks.is_google_connected(db),
-        icloud_connected=icloud_reminders.is_icloud_connected(db)
+        sync_interval_minutes=int(interval or "15"),
+        google_connected=google_connected,
+        icloud_connected=connection_state.is_connected(
+            "icloud", lambda: icloud_reminders.is_icloud_connected(db)
+        )
     )
 
 
@@ -44,8 +59,12 @@ def get_settings(db: Session = Depends(get_db)):
         sync_direction=SyncDirection(direction_str),
         gmail_task_list_id=get_setting(db, "gmail_task_list_id"),
         icloud_calendar_name=get_setting(db, "icloud_calendar_name"),
-        google_connected=google_tasks.is_google_connected(db),
-        icloud_connected=icloud_reminders.is_icloud_connected(db)
+        google_connected=connection_state.is_connected(
+            "google", lambda: google_tasks.is_google_connected(db)
+        ),
+        icloud_connected=connection_state.is_connected(
+            "icloud", lambda: icloud_reminders.is_icloud_connected(db)
+        )
     )
 
 
@@ -69,18 +88,24 @@ def update_settings(settings: SettingsUpdate, db: Session = Depends(get_db)):
 # ============ Sync Operations ============
 
 @router.post("/sync/trigger", response_model=SyncTriggerResponse)
-def trigger_sync(db: Session = Depends(get_db)):
-    """Manually trigger a sync operation."""
-    sync_log = run_sync(db)
-    
-    status_msg = "Sync completed successfully" if sync_log.status == SyncStatus.SUCCESS else f"Sync failed: {sync_log.error_message}"
+def trigger_sync(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """Start a sync in the background and return its log ID."""
+    sync_log = create_sync_log(db)
+    background_tasks.add_task(run_sync_for_log, sync_log.id)
     
     return SyncTriggerResponse(
-        message=status_msg,
+        message="Sync started",
         sync_id=sync_log.id
     )
 
 
+@router.post("/sync/reset")
+def reset_sync(db: Session = Depends(get_db)):
+    """Make the next sync fetch every Gmail task instead of only recent changes."""
+    reset_delta_cursors(db)
+    return {"message": "Next sync will be a full sync"}
+
+
 @router.get("/sync/logs", response_model=List[SyncLogResponse])
 def get_sync_logs(
     limit: int = Query(default=20, le=100),
@@ -88,7 +113,7 @@ def get_sync_logs(
 ):
     """Get sync history logs."""
     logs = db.query(SyncLog).order_by(SyncLog.id.desc()).limit(limit).all()
-    return [SyncLogResponse.model_validate(log) for log in logs]
+    return sync_logs_adapter.validate_python(logs, from_attributes=True)
 
 
 @router.post("/scheduler/start")
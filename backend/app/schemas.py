@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import Optional, List
 from app.models import SyncStatus, SyncDirection
@@ -21,6 +21,8 @@ class SettingsResponse(BaseModel):
 
 
 class SyncLogResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, defer_build=False)
+    
     id: int
     status: SyncStatus
     direction: SyncDirection
@@ -29,9 +31,6 @@ class SyncLogResponse(BaseModel):
     error_message: Optional[str] = None
     started_at: datetime
     completed_at: Optional[datetime] = None
-    
-    class Config:
-        from_attributes = True
 
 
 class SyncTriggerResponse(BaseModel):
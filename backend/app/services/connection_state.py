@@ -0,0 +1,30 @@
+from threading import Lock
+from typing import Callable, Optional
+
+from cachetools import TTLCache
+
+
+# Positive connectivity checks, invalidated on (re)authentication
+_connection_cache = TTLCache(maxsize=2, ttl=300)
+_lock = Lock()
+
+
+def is_connected(service: str, check: Callable[[], bool]) -> bool:
+    """Return the cached connectivity for a service, running check on a miss."""
+    with _lock:
+        connected = _connection_cache.get(service)
+    if connected is None:
+        connected = check()
+        if connected:
+            with _lock:
+                _connection_cache[service] = connected
+    return connected
+
+
+def invalidate(service: Optional[str] = None):
+    """Forget cached connectivity for one service, or for all of them."""
+    with _lock:
+        if service is None:
+            _connection_cache.clear()
+        else:
+            _connection_cache.pop(service, None)
@@ -1,22 +1,29 @@
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
-from typing import List, Optional
+from googleapiclient.errors import HttpError
+from typing import Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import json
 from datetime import datetime
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.models import Credential
+from app.services import connection_state
 
 settings = get_settings()
 
 SCOPES = ['https://www.googleapis.com/auth/tasks']
 
+# Maximum number of calls Google accepts in a single batch request
+BATCH_SIZE = 100
 
-def get_google_auth_flow() -> Flow:
-    """Create OAuth flow for Google authentication."""
-    client_config = {
+@lru_cache(maxsize=1)
+def _get_client_config() -> dict:
+    """Build the OAuth client config from settings (call cache_clear() if settings reload)."""
+    return {
         "web": {
             "client_id": settings.google_client_id,
             "client_secret": settings.google_client_secret,
@@ -25,9 +32,12 @@ def get_google_auth_flow() -> Flow:
             "token_uri": "https://oauth2.googleapis.com/token",
         }
     }
-    
+
+
+def get_google_auth_flow() -> Flow:
+    """Create OAuth flow for Google authentication."""
     flow = Flow.from_client_config(
-        client_config,
+        _get_client_config(),
         scopes=SCOPES,
         redirect_uri=settings.google_redirect_uri
     )
@@ -74,74 +84,163 @@ def exchange_code_for_tokens(code: str, db: Session) -> Credentials:
         db.add(cred_record)
     
     db.commit()
+    invalidate_credentials_cache()
+    connection_state.invalidate("google")
     return credentials
 
 
-def get_google_credentials(db: Session) -> Optional[Credentials]:
-    """Retrieve stored Google credentials."""
-    cred_record = db.query(Credential).filter(Credential.service == "google").first()
-    
-    if not cred_record or not cred_record.access_token:
-        return None
-    
-    extra_data = json.loads(cred_record.extra_data) if cred_record.extra_data else {}
+@lru_cache(maxsize=4)
+def _build_credentials(access_token: str, refresh_token: Optional[str], extra_data: Optional[str]) -> Credentials:
+    """Build a Credentials object from stored token values, cached per token."""
+    extra = json.loads(extra_data) if extra_data else {}
     
     credentials = Credentials(
-        token=cred_record.access_token,
-        refresh_token=cred_record.refresh_token,
-        token_uri=extra_data.get("token_uri", "https://oauth2.googleapis.com/token"),
-        client_id=extra_data.get("client_id", settings.google_client_id),
-        client_secret=extra_data.get("client_secret", settings.google_client_secret),
-        scopes=extra_data.get("scopes", SCOPES)
+        token=access_token,
+        refresh_token=refresh_token,
+        token_uri=extra.get("token_uri", "https://oauth2.googleapis.com/token"),
+        client_id=extra.get("client_id", settings.google_client_id),
+        client_secret=extra.get("client_secret", settings.google_client_secret),
+        scopes=extra.get("scopes", SCOPES)
     )
     
     return credentials
 
 
-def get_tasks_service(db: Session):
-    """Get Google Tasks API service."""
-    credentials = get_google_credentials(db)
-    if not credentials:
+def _get_token_row(db: Session):
+    """Fetch only the token columns of the stored Google credential."""
+    return db.query(
+        Credential.access_token,
+        Credential.refresh_token,
+        Credential.token_expiry,
+        Credential.extra_data
+    ).filter(Credential.service == "google").first()
+
+
+def get_google_credentials(db: Session) -> Optional[Credentials]:
+    """Retrieve stored Google credentials."""
+    token_row = _get_token_row(db)
+    
+    if not token_row or not token_row.access_token:
+        return None
+    
+    return _build_credentials(token_row.access_token, token_row.refresh_token, token_row.extra_data)
+
+
+def invalidate_credentials_cache():
+    """Drop cached credentials, e.g. after re-authentication."""
+    _build_credentials.cache_clear()
+
+
+def get_tasks_service(db: Session, credential: Optional[Credential] = None):
+    """Build a Google Tasks API service, optionally from an already-loaded credential."""
+    token_row = credential if credential is not None else _get_token_row(db)
+    if not token_row or not token_row.access_token:
         raise ValueError("Google credentials not found. Please authenticate first.")
     
+    credentials = _build_credentials(token_row.access_token, token_row.refresh_token, token_row.extra_data)
     return build('tasks', 'v1', credentials=credentials)
 
 
-def list_task_lists(db: Session) -> List[dict]:
+def list_task_lists(db: Session, service=None) -> List[dict]:
     """List all Google Tasks lists."""
-    service = get_tasks_service(db)
+    if service is None:
+        service = get_tasks_service(db)
     results = service.tasklists().list().execute()
     return results.get('items', [])
 
 
-def list_tasks(db: Session, task_list_id: str = '@default') -> List[dict]:
-    """List all tasks in a task list, handling pagination."""
-    service = get_tasks_service(db)
-    all_tasks = []
-    page_token = None
+def iter_tasks(
+    db: Session,
+    task_list_id: str = '@default',
+    service=None,
+    updated_min: Optional[str] = None
+) -> Iterator[dict]:
+    """Yield the tasks in a task list, optionally only those updated since updated_min."""
+    if service is None:
+        service = get_tasks_service(db)
     
-    while True:
-        results = service.tasks().list(
+    def fetch_page(page_token: Optional[str]) -> dict:
+        return service.tasks().list(
             tasklist=task_list_id,
             showCompleted=True,
             showHidden=True,  # Include hidden/completed tasks
             maxResults=100,   # Get more per page
-            pageToken=page_token
+            pageToken=page_token,
+            updatedMin=updated_min,
+            showDeleted=updated_min is not None
         ).execute()
-        
-        tasks = results.get('items', [])
-        all_tasks.extend(tasks)
-        
-        page_token = results.get('nextPageToken')
-        if not page_token:
-            break
     
-    return all_tasks
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_page = executor.submit(fetch_page, None)
+        while next_page is not None:
+            results = next_page.result()
+            page_token = results.get('nextPageToken')
+            next_page = executor.submit(fetch_page, page_token) if page_token else None
+            yield from results.get('items', [])
+
+
+def list_tasks(db: Session, task_list_id: str = '@default', service=None) -> List[dict]:
+    """List all tasks in a task list, handling pagination."""
+    return list(iter_tasks(db, task_list_id, service=service))
+
+
+def _task_request(service, op: str, params: dict):
+    """Build an unexecuted Tasks API request for a mutation."""
+    tasks = service.tasks()
+    if op == "insert":
+        return tasks.insert(tasklist=params["task_list_id"], body=params["body"])
+    if op == "patch":
+        return tasks.patch(tasklist=params["task_list_id"], task=params["task_id"], body=params["body"])
+    if op == "delete":
+        return tasks.delete(tasklist=params["task_list_id"], task=params["task_id"])
+    raise ValueError(f"Unknown task operation '{op}'")
+
+
+def batch_mutations(db: Session, ops: List[Tuple[str, dict]], service=None) -> List[Optional[dict]]:
+    """Apply (op, params) task mutations in batches; returns a result per op, None if it failed."""
+    if not ops:
+        return []
+    if service is None:
+        service = get_tasks_service(db)
+    
+    results: List[Optional[dict]] = [None] * len(ops)
+    
+    def callback(request_id, response, exception):
+        if isinstance(exception, HttpError) and exception.resp.status == 404:
+            results[int(request_id)] = {"deleted": True}
+            return
+        if exception is not None:
+            print(f"Error in batched task {ops[int(request_id)][0]}: {exception}")
+            return
+        # Deletes return an empty body
+        results[int(request_id)] = response or {}
+    
+    for start in range(0, len(ops), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=callback)
+        for index in range(start, min(start + BATCH_SIZE, len(ops))):
+            op, params = ops[index]
+            batch.add(_task_request(service, op, params), request_id=str(index))
+        batch.execute()
+    
+    return results
 
 
-def create_task(db: Session, task_list_id: str, title: str, notes: str = None, due: datetime = None, status: str = None) -> dict:
+def batch_update_tasks(db: Session, updates: List[dict], service=None) -> List[Optional[dict]]:
+    """Patch several tasks in batches; each update holds task_list_id, task_id and the fields."""
+    ops = []
+    for update in updates:
+        fields = dict(update)
+        params = {"task_list_id": fields.pop("task_list_id"), "task_id": fields.pop("task_id")}
+        params["body"] = {key: value for key, value in fields.items() if value is not None}
+        ops.append(("patch", params))
+    
+    return batch_mutations(db, ops, service=service)
+
+
+def create_task(db: Session, task_list_id: str, title: str, notes: str = None, due: datetime = None, status: str = None, service=None) -> dict:
     """Create a new task in Google Tasks."""
-    service = get_tasks_service(db)
+    if service is None:
+        service = get_tasks_service(db)
     
     task_body = {'title': title}
     if notes:
@@ -151,34 +250,32 @@ def create_task(db: Session, task_list_id: str, title: str, notes: str = None, d
     if status:
         task_body['status'] = status
     
-    return service.tasks().insert(tasklist=task_list_id, body=task_body).execute()
+    params = {"task_list_id": task_list_id, "body": task_body}
+    return _task_request(service, "insert", params).execute()
 
 
-def update_task(db: Session, task_list_id: str, task_id: str, **kwargs) -> dict:
-    """Update an existing task."""
-    service = get_tasks_service(db)
-    
-    # Get current task
-    task = service.tasks().get(tasklist=task_list_id, task=task_id).execute()
-    
-    # Update fields
-    for key, value in kwargs.items():
-        if value is not None:
-            task[key] = value
+def update_task(db: Session, task_list_id: str, task_id: str, service=None, **kwargs) -> dict:
+    """Update an existing task, changing only the fields that are not None."""
+    if service is None:
+        service = get_tasks_service(db)
     
-    return service.tasks().update(tasklist=task_list_id, task=task_id, body=task).execute()
+    task_body = {key: value for key, value in kwargs.items() if value is not None}
+    params = {"task_list_id": task_list_id, "task_id": task_id, "body": task_body}
+    return _task_request(service, "patch", params).execute()
 
 
-def delete_task(db: Session, task_list_id: str, task_id: str):
+def delete_task(db: Session, task_list_id: str, task_id: str, service=None):
     """Delete a task."""
-    service = get_tasks_service(db)
-    service.tasks().delete(tasklist=task_list_id, task=task_id).execute()
+    if service is None:
+        service = get_tasks_service(db)
+    params = {"task_list_id": task_list_id, "task_id": task_id}
+    _task_request(service, "delete", params).execute()
 
 
 def is_google_connected(db: Session) -> bool:
     """Check if Google is authenticated."""
     try:
-        creds = get_google_credentials(db)
-        return creds is not None
+        token_row = db.query(Credential.access_token).filter(Credential.service == "google").first()
+        return bool(token_row and token_row.access_token)
     except Exception:
         return False
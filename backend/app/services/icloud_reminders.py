@@ -1,4 +1,4 @@
-from typing import List, Optional, NamedTuple
+from typing import Dict, List, Optional, NamedTuple
 from datetime import datetime
 from threading import Event
 from enum import Enum
@@ -6,11 +6,13 @@ import json
 import platform
 from sqlalchemy.orm import Session
 
+import objc
 from EventKit import EKEventStore, EKEntityTypeReminder, EKReminder
 from Foundation import NSCalendar, NSCalendarUnitYear, NSCalendarUnitMonth, NSCalendarUnitDay
 from Foundation import NSCalendarUnitHour, NSCalendarUnitMinute, NSCalendarUnitSecond, NSDate
 
 from app.models import Credential
+from app.services import connection_state
 
 
 class Priority(Enum):
@@ -30,9 +32,33 @@ class Reminder(NamedTuple):
     list_id: str
 
 
+# Date components stored on reminder due dates
+_DATE_UNITS = (
+    NSCalendarUnitYear | NSCalendarUnitMonth | NSCalendarUnitDay |
+    NSCalendarUnitHour | NSCalendarUnitMinute | NSCalendarUnitSecond
+)
+
+# Tracks the user's calendar/time zone settings, so it is safe to keep
+_CURRENT_CAL = NSCalendar.autoupdatingCurrentCalendar()
+
+
+def _due_date_components(due: datetime):
+    """Build NSDateComponents for a reminder due date."""
+    return _CURRENT_CAL.components_fromDate_(
+        _DATE_UNITS,
+        NSDate.dateWithTimeIntervalSince1970_(due.timestamp()),
+    )
+
+
 # Global EventStore instance
 _event_store: Optional[EKEventStore] = None
 
+# Identifier of the default reminder list, looked up once per process
+_default_calendar_id: Optional[str] = None
+
+# EKCalendar handles keyed by calendar identifier
+_calendar_cache: dict = {}
+
 
 def _get_macos_version() -> tuple:
     """Get macOS version as a tuple of integers."""
@@ -41,6 +67,17 @@ def _get_macos_version() -> tuple:
     return tuple(int(p) for p in parts[:2])
 
 
+# Pick the access request for this macOS version once
+# macOS 14+ uses requestFullAccessToRemindersWithCompletion_
+# Older versions use requestAccessToEntityType_completion_
+if _get_macos_version() >= (14, 0):
+    def _request_access(event_store: EKEventStore, completion_handler) -> None:
+        event_store.requestFullAccessToRemindersWithCompletion_(completion_handler)
+else:
+    def _request_access(event_store: EKEventStore, completion_handler) -> None:
+        event_store.requestAccessToEntityType_completion_(EKEntityTypeReminder, completion_handler)
+
+
 def _grant_permission() -> EKEventStore:
     """Grants permission to access reminders and returns the EKEventStore."""
     event_store = EKEventStore.alloc().init()
@@ -52,15 +89,7 @@ def _grant_permission() -> EKEventStore:
         result["error"] = error
         done.set()
 
-    macos_version = _get_macos_version()
-    
-    # macOS 14+ uses requestFullAccessToRemindersWithCompletion_
-    # Older versions use requestAccessToEntityType_completion_
-    if macos_version >= (14, 0):
-        event_store.requestFullAccessToRemindersWithCompletion_(completion_handler)
-    else:
-        event_store.requestAccessToEntityType_completion_(EKEntityTypeReminder, completion_handler)
-    
+    _request_access(event_store, completion_handler)
     done.wait(timeout=60)
     
     if not result.get("granted"):
@@ -77,6 +106,42 @@ def get_event_store() -> EKEventStore:
     return _event_store
 
 
+def _get_default_calendar_id(event_store: EKEventStore) -> Optional[str]:
+    """Return the default reminder list identifier, caching it after the first lookup."""
+    global _default_calendar_id
+    if _default_calendar_id is None:
+        default_calendar = event_store.defaultCalendarForNewReminders()
+        _default_calendar_id = default_calendar.calendarIdentifier() if default_calendar else None
+    return _default_calendar_id
+
+
+def _refresh_calendar_cache(calendars):
+    """Re-populate the calendar cache if the set of reminder lists changed."""
+    global _default_calendar_id
+    calendars_by_id = {calendar.calendarIdentifier(): calendar for calendar in calendars}
+    if calendars_by_id.keys() != _calendar_cache.keys():
+        _calendar_cache.clear()
+        _calendar_cache.update(calendars_by_id)
+        _default_calendar_id = None
+
+
+def _get_calendar(event_store: EKEventStore, calendar_id: str):
+    """Return the EKCalendar for an identifier, using the cache when possible."""
+    ek_calendar = _calendar_cache.get(calendar_id)
+    if ek_calendar is None:
+        ek_calendar = event_store.calendarWithIdentifier_(calendar_id)
+        if ek_calendar:
+            _calendar_cache[calendar_id] = ek_calendar
+    return ek_calendar
+
+
+def warm_up():
+    """Acquire Reminders access and prefetch calendars ahead of the first request."""
+    event_store = get_event_store()
+    _refresh_calendar_cache(event_store.calendarsForEntityType_(EKEntityTypeReminder))
+    _get_default_calendar_id(event_store)
+
+
 def save_icloud_credentials(db: Session, username: str, app_password: str):
     """Store iCloud credentials in database.
     
@@ -98,11 +163,15 @@ def save_icloud_credentials(db: Session, username: str, app_password: str):
         db.add(cred_record)
     
     db.commit()
+    connection_state.invalidate("icloud")
 
 
 def get_icloud_credentials(db: Session) -> Optional[tuple]:
     """Retrieve stored iCloud credentials."""
-    cred_record = db.query(Credential).filter(Credential.service == "icloud").first()
+    cred_record = db.query(
+        Credential.access_token,
+        Credential.extra_data
+    ).filter(Credential.service == "icloud").first()
     
     if not cred_record or not cred_record.access_token:
         return None
@@ -120,9 +189,9 @@ def list_reminder_calendars(db: Session) -> List[dict]:
     """List all reminder lists using EventKit."""
     event_store = get_event_store()
     calendars = event_store.calendarsForEntityType_(EKEntityTypeReminder)
+    _refresh_calendar_cache(calendars)
     
-    default_calendar = event_store.defaultCalendarForNewReminders()
-    default_id = default_calendar.calendarIdentifier() if default_calendar else None
+    default_id = _get_default_calendar_id(event_store)
     
     result = []
     for calendar in calendars:
@@ -136,68 +205,70 @@ def list_reminder_calendars(db: Session) -> List[dict]:
     return result
 
 
-def _convert_ek_reminder(ek_reminder) -> Reminder:
-    """Convert an EKReminder to our Reminder type."""
+def _ek_reminder_to_dict(ek_reminder) -> dict:
+    """Convert an EKReminder straight to the dict returned by list_reminders."""
     due_date = None
-    if ek_reminder.dueDateComponents():
-        ns_date = ek_reminder.dueDateComponents().date()
+    due_components = ek_reminder.dueDateComponents()
+    if due_components:
+        ns_date = due_components.date()
         if ns_date:
             due_date = datetime.fromtimestamp(ns_date.timeIntervalSince1970())
     
-    return Reminder(
-        id=ek_reminder.calendarItemIdentifier(),
-        title=ek_reminder.title() or "",
-        due_date=due_date,
-        notes=ek_reminder.notes(),
-        completed=ek_reminder.isCompleted(),
-        priority=ek_reminder.priority() if hasattr(ek_reminder, "priority") else 0,
-        list_id=ek_reminder.calendar().calendarIdentifier(),
-    )
+    return {
+        "id": ek_reminder.calendarItemIdentifier(),
+        "summary": ek_reminder.title() or "",
+        "description": ek_reminder.notes(),
+        "due": due_date,
+        "completed": ek_reminder.isCompleted(),
+        "priority": ek_reminder.priority(),
+        "list_id": ek_reminder.calendar().calendarIdentifier(),
+        "flagged": False,
+        "url": None
+    }
 
 
-def list_reminders(db: Session, calendar_id: str) -> List[dict]:
-    """List all reminders in a reminder list."""
+def list_reminders_multi(db: Session, calendar_ids: List[str]) -> Dict[str, List[dict]]:
+    """List reminders for several reminder lists with a single EventKit fetch."""
+    result = {calendar_id: [] for calendar_id in calendar_ids}
     event_store = get_event_store()
     
-    # Get the calendar
-    ek_calendar = event_store.calendarWithIdentifier_(calendar_id)
-    if not ek_calendar:
-        return []
-    
-    # Create predicate for all reminders in this calendar
-    predicate = event_store.predicateForRemindersInCalendars_([ek_calendar])
-    
-    # Fetch reminders
-    fetch_done = Event()
-    found_reminders = []
-    
-    def completion_handler(reminders):
-        nonlocal found_reminders
-        if reminders:
-            found_reminders = list(reminders)
-        fetch_done.set()
-    
-    event_store.fetchRemindersMatchingPredicate_completion_(predicate, completion_handler)
-    fetch_done.wait(timeout=30)
-    
-    result = []
-    for ek_reminder in found_reminders:
-        r = _convert_ek_reminder(ek_reminder)
-        result.append({
-            "id": r.id,
-            "summary": r.title,
-            "description": r.notes,
-            "due": r.due_date,
-            "completed": r.completed,
-            "priority": r.priority,
-            "list_id": r.list_id,
-            "flagged": False,
-            "url": None
-        })
-    
+    # Resolve all calendars up front so one predicate covers them
+    ek_calendars = [
+        ek_calendar for ek_calendar in
+        (_get_calendar(event_store, calendar_id) for calendar_id in calendar_ids)
+        if ek_calendar
+    ]
+    if not ek_calendars:
+        return result
+    
+    # Drain the Objective-C temporaries created while fetching and converting
+    with objc.autorelease_pool():
+        predicate = event_store.predicateForRemindersInCalendars_(ek_calendars)
+        
+        # Fetch reminders
+        fetch_done = Event()
+        found_reminders = []
+        
+        def completion_handler(reminders):
+            nonlocal found_reminders
+            if reminders:
+                found_reminders = list(reminders)
+            fetch_done.set()
+        
+        event_store.fetchRemindersMatchingPredicate_completion_(predicate, completion_handler)
+        fetch_done.wait(timeout=30)
+        
+        for reminder in map(_ek_reminder_to_dict, found_reminders):
+            result.setdefault(reminder["list_id"], []).append(reminder)
+        
     return result
 
 
+def list_reminders(db: Session, calendar_id: str) -> List[dict]:
+    """List all reminders in a reminder list."""
+    return list_reminders_multi(db, [calendar_id])[calendar_id]
+
+
 def create_reminder(
     db: Session,
     calendar_id: str,
@@ -210,40 +281,58 @@ def create_reminder(
     event_store = get_event_store()
     
     # Get the calendar
-    ek_calendar = event_store.calendarWithIdentifier_(calendar_id)
+    ek_calendar = _get_calendar(event_store, calendar_id)
     if not ek_calendar:
         raise ValueError(f"Calendar with ID '{calendar_id}' not found")
     
-    # Create reminder
-    new_reminder = EKReminder.reminderWithEventStore_(event_store)
-    new_reminder.setCalendar_(ek_calendar)
-    new_reminder.setTitle_(summary)
-    
-    if description:
-        new_reminder.setNotes_(description)
-    
-    if due:
-        components = NSCalendar.currentCalendar().components_fromDate_(
-            NSCalendarUnitYear | NSCalendarUnitMonth | NSCalendarUnitDay |
-            NSCalendarUnitHour | NSCalendarUnitMinute | NSCalendarUnitSecond,
-            NSDate.dateWithTimeIntervalSince1970_(due.timestamp()),
-        )
-        new_reminder.setDueDateComponents_(components)
-    
-    if priority:
-        new_reminder.setPriority_(priority)
+    # Drain autoreleased temporaries per call, so bulk creates stay flat
+    with objc.autorelease_pool():
+        # Create reminder
+        new_reminder = EKReminder.reminderWithEventStore_(event_store)
+        new_reminder.setCalendar_(ek_calendar)
+        new_reminder.setTitle_(summary)
+        
+        if description:
+            new_reminder.setNotes_(description)
+        
+        if due:
+            new_reminder.setDueDateComponents_(_due_date_components(due))
+        
+        if priority:
+            new_reminder.setPriority_(priority)
+        
+        # Save - PyObjC returns (success, error) tuple for methods with error output params
+        success, error = event_store.saveReminder_commit_error_(new_reminder, True, None)
+        
+        if not success:
+            raise RuntimeError(f"Failed to create reminder: {error}")
+        
+        return {
+            "id": new_reminder.calendarItemIdentifier(),
+            "summary": new_reminder.title(),
+            "list_id": ek_calendar.calendarIdentifier()
+        }
+
+
+def _apply_reminder_changes(
+    ek_reminder,
+    summary: str = None,
+    description: str = None,
+    completed: bool = None,
+    due: datetime = None
+):
+    """Set the given (non-None) fields on an EKReminder without saving it."""
+    if summary is not None:
+        ek_reminder.setTitle_(summary)
     
-    # Save - PyObjC returns (success, error) tuple for methods with error output params
-    success, error = event_store.saveReminder_commit_error_(new_reminder, True, None)
+    if description is not None:
+        ek_reminder.setNotes_(description)
     
-    if not success:
-        raise RuntimeError(f"Failed to create reminder: {error}")
+    if completed is not None:
+        ek_reminder.setCompleted_(completed)
     
-    return {
-        "id": new_reminder.calendarItemIdentifier(),
-        "summary": new_reminder.title(),
-        "list_id": ek_calendar.calendarIdentifier()
-    }
+    if due is not None:
+        ek_reminder.setDueDateComponents_(_due_date_components(due))
 
 
 def update_reminder(
@@ -261,22 +350,7 @@ def update_reminder(
     if not ek_reminder:
         raise ValueError(f"Reminder with ID '{reminder_id}' not found")
     
-    if summary is not None:
-        ek_reminder.setTitle_(summary)
-    
-    if description is not None:
-        ek_reminder.setNotes_(description)
-    
-    if completed is not None:
-        ek_reminder.setCompleted_(completed)
-    
-    if due is not None:
-        components = NSCalendar.currentCalendar().components_fromDate_(
-            NSCalendarUnitYear | NSCalendarUnitMonth | NSCalendarUnitDay |
-            NSCalendarUnitHour | NSCalendarUnitMinute | NSCalendarUnitSecond,
-            NSDate.dateWithTimeIntervalSince1970_(due.timestamp()),
-        )
-        ek_reminder.setDueDateComponents_(components)
+    _apply_reminder_changes(ek_reminder, summary, description, completed, due)
     
     # Save - PyObjC returns (success, error) tuple for methods with error output params
     success, error = event_store.saveReminder_commit_error_(ek_reminder, True, None)
@@ -291,6 +365,41 @@ def update_reminder(
     }
 
 
+def batch_update_reminders(db: Session, updates: List[dict]) -> List[bool]:
+    """Update several reminders and write them to the store in one commit."""
+    if not updates:
+        return []
+    
+    event_store = get_event_store()
+    saved = []
+    
+    with objc.autorelease_pool():
+        for update in updates:
+            fields = dict(update)
+            reminder_id = fields.pop("id")
+            
+            ek_reminder = event_store.calendarItemWithIdentifier_(reminder_id)
+            if not ek_reminder:
+                print(f"Reminder with ID '{reminder_id}' not found")
+                saved.append(False)
+                continue
+            
+            _apply_reminder_changes(ek_reminder, **fields)
+            
+            # Stage the change; everything is committed together below
+            success, error = event_store.saveReminder_commit_error_(ek_reminder, False, None)
+            if not success:
+                print(f"Failed to update reminder: {error}")
+            saved.append(bool(success))
+        
+        success, error = event_store.commit_(None)
+        if not success:
+            event_store.reset()
+            raise RuntimeError(f"Failed to commit reminder updates: {error}")
+    
+    return saved
+
+
 def delete_reminder(db: Session, reminder_id: str):
     """Delete a reminder using EventKit."""
     event_store = get_event_store()
@@ -1,4 +1,6 @@
-from apscheduler.schedulers.background import BackgroundScheduler
+import asyncio
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
 from typing import Optional
@@ -7,23 +9,33 @@ from app.database import SessionLocal
 from app.services.sync_service import run_sync, get_setting
 
 
+# Started from the app lifespan, on the server's event loop
+_scheduler = AsyncIOScheduler()
+
+
 class SyncScheduler:
-    _instance = None
-    _scheduler: Optional[BackgroundScheduler] = None
+    """Manages the sync job on the module-level scheduler."""
     _job_id = "sync_job"
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._scheduler = BackgroundScheduler()
-            cls._scheduler.start()
-        return cls._instance
-    
     @property
-    def scheduler(self) -> BackgroundScheduler:
-        return self._scheduler
+    def scheduler(self) -> AsyncIOScheduler:
+        return _scheduler
+    
+    def start(self):
+        """Start the scheduler on the running event loop (call from app startup)."""
+        if not _scheduler.running:
+            _scheduler.start()
+    
+    def shutdown(self):
+        """Shut the scheduler down without waiting for a running job."""
+        if _scheduler.running:
+            _scheduler.shutdown(wait=False)
+    
+    async def _run_sync_job(self):
+        """Run the sync off the event loop so EventKit and Google API calls don't block it."""
+        await asyncio.to_thread(self._run_sync_blocking)
     
-    def _run_sync_job(self):
+    def _run_sync_blocking(self):
         """Execute sync job with its own database session."""
         db = SessionLocal()
         try:
@@ -46,13 +58,16 @@ class SyncScheduler:
         # Remove existing job if any
         self.stop_sync_job()
         
-        # Add new job
-        self._scheduler.add_job(
+        # Add new job; a run that outlasts the interval skips the next tick
+        _scheduler.add_job(
             self._run_sync_job,
             trigger=IntervalTrigger(minutes=interval_minutes),
             id=self._job_id,
             name="Gmail-iCloud Sync",
-            replace_existing=True
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=60
         )
         
         print(f"Sync job scheduled to run every {interval_minutes} minutes")
@@ -60,18 +75,18 @@ class SyncScheduler:
     def stop_sync_job(self):
         """Stop the sync job."""
         try:
-            self._scheduler.remove_job(self._job_id)
+            _scheduler.remove_job(self._job_id)
         except Exception:
             pass  # Job doesn't exist
     
     def is_running(self) -> bool:
         """Check if the sync job is scheduled."""
-        job = self._scheduler.get_job(self._job_id)
+        job = _scheduler.get_job(self._job_id)
         return job is not None
     
     def get_next_run_time(self) -> Optional[datetime]:
         """Get the next scheduled run time."""
-        job = self._scheduler.get_job(self._job_id)
+        job = _scheduler.get_job(self._job_id)
         return job.next_run_time if job else None
     
     def trigger_now(self):
@@ -1,182 +1,333 @@
-from datetime import datetime
-from typing import Optional
-from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+import hashlib
+from itertools import chain
+import sys
+from threading import Lock, RLock
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, load_only
 
-from app.models import SyncLog, SyncStatus, SyncDirection, TaskMapping, Settings
-from app.services import google_tasks, icloud_reminders
+from app.database import SessionLocal
+from app.models import SyncLog, SyncStatus, SyncDirection, TaskMapping, Settings, Credential
+from app.services import google_tasks, icloud_reminders, connection_state
+
+
+# All settings rows, cached until a setting is written
+_settings_cache: Optional[Dict[str, Optional[str]]] = None
+_settings_lock = RLock()
+
+# Rows per mapping upsert statement, and the columns it writes on conflict
+UPSERT_CHUNK_SIZE = 1000
+_UPSERT_COLUMNS = (
+    "gmail_task_list_id",
+    "icloud_reminder_uid",
+    "icloud_calendar_url",
+    "title",
+    "last_known_completed",
+    "last_synced_hash",
+)
+
+# How far the stored Gmail delta cursor trails each run's start
+DELTA_CURSOR_OVERLAP = timedelta(minutes=5)
+
+# Held for the duration of a sync so manual and scheduled runs never overlap
+_sync_lock = Lock()
+
+
+def load_all_settings(db: Session) -> Dict[str, Optional[str]]:
+    """Get all settings as a dict, loading them from the database on first use."""
+    global _settings_cache
+    with _settings_lock:
+        if _settings_cache is None:
+            _settings_cache = dict(db.query(Settings.key, Settings.value).all())
+        return dict(_settings_cache)
 
 
 def get_setting(db: Session, key: str, default: str = None) -> Optional[str]:
-    """Get a setting value from the database."""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    return setting.value if setting else default
+    """Get a setting value, served from the settings cache."""
+    settings = load_all_settings(db)
+    return settings[key] if key in settings else default
 
 
 def set_setting(db: Session, key: str, value: str):
     """Set a setting value in the database."""
-    setting = db.query(Settings).filter(Settings.key == key).first()
-    if setting:
-        setting.value = value
-    else:
-        setting = Settings(key=key, value=value)
-        db.add(setting)
+    global _settings_cache
+    stmt = pg_insert(Settings).values(key=key, value=value)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Settings.key],
+        set_={"value": stmt.excluded.value, "updated_at": func.now()},
+    )
+    db.execute(stmt)
     db.commit()
+    
+    with _settings_lock:
+        _settings_cache = None
+
+
+def _mapping_row(
+    gmail_task_id: str,
+    gmail_task_list_id: str,
+    icloud_reminder_uid: str,
+    icloud_calendar_url: str,
+    title: str,
+    content_hash: str
+) -> dict:
+    """Build the column values of a task mapping to be upserted."""
+    return {
+        "gmail_task_id": gmail_task_id,
+        "gmail_task_list_id": gmail_task_list_id,
+        "icloud_reminder_uid": icloud_reminder_uid,
+        "icloud_calendar_url": icloud_calendar_url,
+        "title": title,
+        "last_synced_hash": content_hash,
+    }
+
+
+if sys.version_info >= (3, 11):
+    _fromisoformat = datetime.fromisoformat
+else:
+    # Before 3.11, fromisoformat doesn't accept the "Z" suffix
+    def _fromisoformat(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@lru_cache(maxsize=1024)
+def _parse_google_datetime(value: str) -> datetime:
+    """Parse an RFC 3339 timestamp from the Tasks API."""
+    return _fromisoformat(value)
+
+
+def _content_hash(title: str, notes: Optional[str], due: Optional[datetime], completed: bool) -> str:
+    """Fingerprint the synced fields of an item, to detect no-op updates."""
+    payload = "\x1f".join((
+        title or "",
+        notes or "",
+        due.isoformat() if due else "",
+        "1" if completed else "0",
+    ))
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def upsert_mappings(db: Session, rows: List[dict]):
+    """Insert or update task mappings in bulk, keyed on gmail_task_id."""
+    if not rows:
+        return
+    
+    # Postgres refuses to update the same row twice in one statement
+    rows = list({row["gmail_task_id"]: row for row in rows}.values())
+    
+    # Chunked to stay well under Postgres' bind parameter limit
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = pg_insert(TaskMapping).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        changed = [
+            getattr(TaskMapping, column).is_distinct_from(getattr(stmt.excluded, column))
+            for column in _UPSERT_COLUMNS
+        ]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TaskMapping.gmail_task_id],
+            set_={
+                **{column: getattr(stmt.excluded, column) for column in _UPSERT_COLUMNS},
+                "updated_at": func.now(),
+            },
+            where=or_(*changed)
+        )
+        db.execute(stmt)
 
 
 def sync_gmail_task_to_icloud(
     db: Session,
     task: dict,
     task_list_id: str,
-    calendar_id: str
-) -> Optional[TaskMapping]:
-    """Sync a single Gmail task to iCloud reminders."""
+    calendar_id: str,
+    known_mappings: Optional[Dict[str, TaskMapping]] = None
+) -> Optional[dict]:
+    """Sync a single Gmail task to iCloud reminders, returning the mapping row or None."""
     # Check if already mapped
-    mapping = db.query(TaskMapping).filter(
-        TaskMapping.gmail_task_id == task["id"]
-    ).first()
+    if known_mappings is not None:
+        mapping = known_mappings.get(task["id"])
+    else:
+        mapping = db.query(TaskMapping).filter(
+            TaskMapping.gmail_task_id == task["id"]
+        ).first()
     
     title = task.get("title", "Untitled Task")
     notes = task.get("notes", "")
     due_str = task.get("due")
-    due = datetime.fromisoformat(due_str.replace("Z", "+00:00")) if due_str else None
+    due = _parse_google_datetime(due_str) if due_str else None
     is_completed = task.get("status") == "completed"
+    content_hash = _content_hash(title, notes, due, is_completed)
     
     if mapping and mapping.icloud_reminder_uid:
-        # Update existing reminder
-        try:
-            # Update reminder directly by ID
-            icloud_reminders.update_reminder(
-                db,
-                mapping.icloud_reminder_uid,
-                summary=title,
-                description=notes,
-                completed=is_completed,
-                due=due
-            )
-            mapping.title = title
-            mapping.updated_at = datetime.utcnow()
-            db.commit()
-        except Exception as e:
-            print(f"Error updating reminder: {e}")
-    else:
-        # Create new reminder
-        try:
-            result = icloud_reminders.create_reminder(
-                db,
-                calendar_id,
-                summary=title,
-                description=notes,
-                due=due
-            )
-            
-            if mapping:
-                mapping.icloud_reminder_uid = result["id"]
-                mapping.icloud_calendar_url = calendar_id
-                mapping.title = title
-                mapping.updated_at = datetime.utcnow()
-            else:
-                mapping = TaskMapping(
-                    gmail_task_id=task["id"],
-                    gmail_task_list_id=task_list_id,
-                    icloud_reminder_uid=result["id"],
-                    icloud_calendar_url=calendar_id,
-                    title=title
+        # Update existing reminder, unless nothing changed since the last sync
+        if mapping.last_synced_hash != content_hash:
+            try:
+                # Update reminder directly by ID
+                icloud_reminders.update_reminder(
+                    db,
+                    mapping.icloud_reminder_uid,
+                    summary=title,
+                    description=notes,
+                    completed=is_completed,
+                    due=due
                 )
-                db.add(mapping)
-            
-            db.commit()
-        except Exception as e:
-            print(f"Error creating reminder: {e}")
-            return None
+            except Exception as e:
+                print(f"Error updating reminder: {e}")
+                return None
+        
+        return _mapping_row(
+            mapping.gmail_task_id,
+            mapping.gmail_task_list_id,
+            mapping.icloud_reminder_uid,
+            mapping.icloud_calendar_url,
+            title,
+            content_hash
+        )
     
-    return mapping
+    # Create new reminder
+    try:
+        result = icloud_reminders.create_reminder(
+            db,
+            calendar_id,
+            summary=title,
+            description=notes,
+            due=due
+        )
+    except Exception as e:
+        print(f"Error creating reminder: {e}")
+        return None
+    
+    return _mapping_row(
+        task["id"],
+        mapping.gmail_task_list_id if mapping else task_list_id,
+        result["id"],
+        calendar_id,
+        title,
+        content_hash
+    )
 
 
-def sync_icloud_reminder_to_gmail(
+def _task_body(title: str, notes: Optional[str], due: Optional[datetime], completed: bool) -> dict:
+    """Build the Google Tasks body for a reminder's content."""
+    body = {"title": title}
+    if notes:
+        body["notes"] = notes
+    if due:
+        body["due"] = due.isoformat() + "Z"
+    body["status"] = "completed" if completed else "needsAction"
+    return body
+
+
+def sync_icloud_reminders_to_gmail(
     db: Session,
-    reminder: dict,
+    reminders: List[dict],
     calendar_id: str,
-    task_list_id: str
-) -> Optional[TaskMapping]:
-    """Sync a single iCloud reminder to Gmail tasks."""
-    # Check if already mapped
-    mapping = db.query(TaskMapping).filter(
-        TaskMapping.icloud_reminder_uid == reminder["id"]
-    ).first()
-    
-    title = reminder.get("summary", "Untitled Reminder")
-    notes = reminder.get("description", "")
-    due = reminder.get("due")
-    is_completed = reminder.get("completed", False)
+    task_list_id: str,
+    service=None,
+    known_mappings: Optional[Dict[str, TaskMapping]] = None
+) -> List[Optional[dict]]:
+    """Sync iCloud reminders to Gmail tasks in batches, returning a mapping row (or None) per reminder."""
+    rows: List[Optional[dict]] = []
+    ops = []
+    op_rows = []
     
-    if mapping and mapping.gmail_task_id:
-        # Update existing task
-        try:
-            update_data = {"title": title}
-            if notes:
-                update_data["notes"] = notes
-            if due:
-                update_data["due"] = due.isoformat() + "Z" if due else None
-            # Sync completion status
-            update_data["status"] = "completed" if is_completed else "needsAction"
-            
-            google_tasks.update_task(
-                db,
-                mapping.gmail_task_list_id,
+    for reminder in reminders:
+        # Check if already mapped
+        if known_mappings is not None:
+            mapping = known_mappings.get(reminder["id"])
+        else:
+            mapping = db.query(TaskMapping).filter(
+                TaskMapping.icloud_reminder_uid == reminder["id"]
+            ).first()
+        
+        title = reminder.get("summary", "Untitled Reminder")
+        notes = reminder.get("description", "")
+        due = reminder.get("due")
+        is_completed = reminder.get("completed", False)
+        content_hash = _content_hash(title, notes, due, is_completed)
+        body = _task_body(title, notes, due, is_completed)
+        
+        if mapping and mapping.gmail_task_id:
+            row = _mapping_row(
                 mapping.gmail_task_id,
-                **update_data
-            )
-            mapping.title = title
-            mapping.updated_at = datetime.utcnow()
-            db.commit()
-        except Exception as e:
-            print(f"Error updating task: {e}")
-    else:
-        # Create new task
-        try:
-            result = google_tasks.create_task(
-                db,
-                task_list_id,
-                title=title,
-                notes=notes,
-                due=due,
-                status="completed" if is_completed else "needsAction"
+                mapping.gmail_task_list_id,
+                mapping.icloud_reminder_uid,
+                mapping.icloud_calendar_url,
+                title,
+                content_hash
             )
-            
-            if mapping:
-                mapping.gmail_task_id = result["id"]
-                mapping.gmail_task_list_id = task_list_id
-                mapping.title = title
-                mapping.updated_at = datetime.utcnow()
-            else:
-                mapping = TaskMapping(
-                    gmail_task_id=result["id"],
-                    gmail_task_list_id=task_list_id,
-                    icloud_reminder_uid=reminder["id"],
-                    icloud_calendar_url=calendar_id,
-                    title=title
-                )
-                db.add(mapping)
-            
-            db.commit()
-        except Exception as e:
-            print(f"Error creating task: {e}")
-            return None
+            # Update existing task, unless nothing changed since the last sync or it was deleted
+            if mapping.last_synced_hash != content_hash and not mapping.gmail_deleted:
+                ops.append(("patch", {
+                    "task_list_id": mapping.gmail_task_list_id,
+                    "task_id": mapping.gmail_task_id,
+                    "body": body,
+                }))
+                op_rows.append((len(rows), mapping))
+        else:
+            # Create new task; its ID is filled in from the batch result
+            row = _mapping_row(None, task_list_id, reminder["id"], calendar_id, title, content_hash)
+            ops.append(("insert", {"task_list_id": task_list_id, "body": body}))
+            op_rows.append((len(rows), None))
+        rows.append(row)
+    
+    results = google_tasks.batch_mutations(db, ops, service=service)
+    for (index, mapping), result in zip(op_rows, results):
+        if result is None:
+            rows[index] = None
+        elif mapping is None:
+            rows[index]["gmail_task_id"] = result["id"]
+        elif result.get("deleted"):
+            mapping.gmail_deleted = True
     
-    return mapping
+    return rows
 
 
-def run_sync(db: Session, direction: SyncDirection = None) -> SyncLog:
-    """Run the synchronization between Gmail Tasks and iCloud Reminders."""
-    # Get settings
+def _gmail_status_update(mapping: TaskMapping, completed: bool) -> dict:
+    """Build a batched Gmail update setting a mapped task's completion status."""
+    return {
+        "task_list_id": mapping.gmail_task_list_id,
+        "task_id": mapping.gmail_task_id,
+        "status": "completed" if completed else "needsAction",
+    }
+
+
+def _delta_cursor_key(task_list_id: str) -> str:
+    return f"gmail_updated_min:{task_list_id}"
+
+
+def reset_delta_cursors(db: Session):
+    """Forget all Gmail delta cursors so the next sync fetches every task."""
+    global _settings_cache
+    db.query(Settings).filter(
+        Settings.key.like(_delta_cursor_key("%"))
+    ).delete(synchronize_session=False)
+    db.commit()
+    
+    with _settings_lock:
+        _settings_cache = None
+
+
+def _partition_by_mapping(items: Iterable[dict], mapped_ids) -> Tuple[Dict[str, dict], List[dict]]:
+    """Split items into those already mapped (keyed by ID) and new ones, in one pass."""
+    mapped = {}
+    new = []
+    for item in items:
+        if item["id"] in mapped_ids:
+            mapped[item["id"]] = item
+        else:
+            new.append(item)
+    return mapped, new
+
+
+def create_sync_log(db: Session, direction: SyncDirection = None) -> SyncLog:
+    """Create a running sync log entry for a sync about to start."""
     if direction is None:
         direction_str = get_setting(db, "sync_direction", SyncDirection.BIDIRECTIONAL.value)
         direction = SyncDirection(direction_str)
     
-    task_list_id = get_setting(db, "gmail_task_list_id", "@default")
-    calendar_id = get_setting(db, "icloud_calendar_name")
-    
-    # Create sync log
     sync_log = SyncLog(
         status=SyncStatus.RUNNING,
         direction=direction,
@@ -185,127 +336,298 @@ def run_sync(db: Session, direction: SyncDirection = None) -> SyncLog:
     db.add(sync_log)
     db.commit()
     db.refresh(sync_log)
+    return sync_log
+
+
+def fail_running_sync_logs(db: Session, error_message: str, sync_log_id: int = None):
+    """Mark running sync log entries (or just the given one) as failed."""
+    query = db.query(SyncLog).filter(SyncLog.status == SyncStatus.RUNNING.value)
+    if sync_log_id is not None:
+        query = query.filter(SyncLog.id == sync_log_id)
+    query.update(
+        {
+            SyncLog.status: SyncStatus.FAILED.value,
+            SyncLog.error_message: error_message,
+            SyncLog.completed_at: datetime.utcnow(),
+        },
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def run_sync_for_log(sync_log_id: int):
+    """Run the sync for an existing log entry with its own database session."""
+    db = SessionLocal()
+    try:
+        run_sync(db, sync_log=db.get(SyncLog, sync_log_id))
+    except Exception as e:
+        print(f"Background sync error: {e}")
+        # The session may be unusable, so record the failure with a new one
+        fail_db = SessionLocal()
+        try:
+            fail_running_sync_logs(fail_db, str(e), sync_log_id)
+        except Exception as fail_error:
+            print(f"Could not mark sync {sync_log_id} as failed: {fail_error}")
+        finally:
+            fail_db.close()
+    finally:
+        db.close()
+
+
+def run_sync(db: Session, direction: SyncDirection = None, sync_log: SyncLog = None) -> SyncLog:
+    """Run the synchronization between Gmail Tasks and iCloud Reminders."""
+    if sync_log is None:
+        sync_log = create_sync_log(db, direction)
+    
+    if not _sync_lock.acquire(blocking=False):
+        sync_log.status = SyncStatus.FAILED
+        sync_log.error_message = "Skipped: another sync is already running"
+        sync_log.completed_at = datetime.utcnow()
+        db.commit()
+        db.refresh(sync_log)
+        return sync_log
+    
+    try:
+        return _run_sync_locked(db, sync_log)
+    finally:
+        _sync_lock.release()
+
+
+def _run_sync_locked(db: Session, sync_log: SyncLog) -> SyncLog:
+    """Run the sync for a log entry; the caller holds the sync lock."""
+    direction = SyncDirection(sync_log.direction)
+    
+    settings = load_all_settings(db)
+    task_list_id = settings.get("gmail_task_list_id") or "@default"
+    calendar_id = settings.get("icloud_calendar_name")
     
     tasks_synced = 0
     reminders_synced = 0
     error_message = None
     
+    # Fetch only Gmail tasks changed since the last clean run
+    updated_min = settings.get(_delta_cursor_key(task_list_id))
+    next_updated_min = (datetime.utcnow() - DELTA_CURSOR_OVERLAP).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    sync_clean = True
+    
+    # Mapping changes are committed once per phase
     try:
+        # Load the Google credential once and reuse it for the whole run
+        google_credential = db.query(Credential).filter(Credential.service == "google").first()
+        
         # Check connections
-        if not google_tasks.is_google_connected(db):
+        if not google_credential or not google_credential.access_token:
             raise ValueError("Google Tasks is not connected. Please authenticate first.")
         
-        if not icloud_reminders.is_icloud_connected(db):
+        if not connection_state.is_connected("icloud", lambda: icloud_reminders.is_icloud_connected(db)):
             raise ValueError("iCloud is not connected. Please configure credentials first.")
         
         if not calendar_id:
             raise ValueError("iCloud calendar not configured. Please select a reminder list.")
         
-        # Build maps of current state for bidirectional sync
-        gmail_tasks_map = {}
-        icloud_reminders_map = {}
+        # Resolve the Tasks API client once and share it across the whole run
+        service = google_tasks.get_tasks_service(db, credential=google_credential)
+        
+        # Get all existing mappings (only the columns the sync reads), indexed by both IDs
+        mappings = db.query(TaskMapping).options(load_only(
+            TaskMapping.gmail_task_id,
+            TaskMapping.gmail_task_list_id,
+            TaskMapping.icloud_reminder_uid,
+            TaskMapping.icloud_calendar_url,
+            TaskMapping.last_known_completed,
+            TaskMapping.last_synced_hash,
+            TaskMapping.gmail_deleted,
+        )).all()
+        mappings_by_gmail = {m.gmail_task_id: m for m in mappings}
+        mappings_by_icloud = {m.icloud_reminder_uid: m for m in mappings if m.icloud_reminder_uid}
         
-        if direction in [SyncDirection.GMAIL_TO_ICLOUD, SyncDirection.BIDIRECTIONAL]:
-            tasks = google_tasks.list_tasks(db, task_list_id)
-            gmail_tasks_map = {t["id"]: t for t in tasks if t.get("title")}
+        # Current state of each side, split into mapped items and new ones
+        gmail_tasks_map, new_gmail_tasks = {}, []
+        icloud_reminders_map, new_icloud_reminders = {}, []
+        deleted_gmail_ids = set()
+        
+        def live_tasks():
+            for t in google_tasks.iter_tasks(db, task_list_id, service=service, updated_min=updated_min):
+                if t.get("deleted"):
+                    deleted_gmail_ids.add(t["id"])
+                elif t.get("title"):
+                    yield t
+        
+        # Fetch Google Tasks in a worker thread while EventKit is queried here
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            tasks_future = None
+            if direction in [SyncDirection.GMAIL_TO_ICLOUD, SyncDirection.BIDIRECTIONAL]:
+                tasks_future = executor.submit(_partition_by_mapping, live_tasks(), mappings_by_gmail)
+            
+            if direction in [SyncDirection.ICLOUD_TO_GMAIL, SyncDirection.BIDIRECTIONAL]:
+                reminders = (r for r in icloud_reminders.list_reminders(db, calendar_id) if r.get("summary"))
+                icloud_reminders_map, new_icloud_reminders = _partition_by_mapping(reminders, mappings_by_icloud)
+            
+            if tasks_future is not None:
+                gmail_tasks_map, new_gmail_tasks = tasks_future.result()
         
-        if direction in [SyncDirection.ICLOUD_TO_GMAIL, SyncDirection.BIDIRECTIONAL]:
-            reminders = icloud_reminders.list_reminders(db, calendar_id)
-            icloud_reminders_map = {r["id"]: r for r in reminders if r.get("summary")}
+        # Stop syncing mappings whose Gmail task was deleted
+        for task_id in deleted_gmail_ids:
+            if task_id in mappings_by_gmail:
+                mappings_by_gmail[task_id].gmail_deleted = True
         
         # For bidirectional sync, handle completion changes intelligently
         if direction == SyncDirection.BIDIRECTIONAL:
-            # Get all existing mappings
-            mappings = db.query(TaskMapping).all()
+            # Updates for both sides are queued and sent in batches after the loop
+            pending_gmail_updates = []
+            pending_gmail_states = []
+            pending_icloud_updates = []
+            pending_icloud_states = []
+            
+            # Completion handlers, indexed by (gmail_changed << 1) | icloud_changed
+            def keep_completion(mapping, gmail_completed, icloud_completed, icloud_update):
+                return None
+            
+            def push_completion_to_gmail(mapping, gmail_completed, icloud_completed, icloud_update):
+                pending_gmail_updates.append(_gmail_status_update(mapping, icloud_completed))
+                pending_gmail_states.append((mapping, icloud_completed))
+                mapping.last_synced_hash = None
+                return None
+            
+            def push_completion_to_icloud(mapping, gmail_completed, icloud_completed, icloud_update):
+                icloud_update["completed"] = gmail_completed
+                return gmail_completed
+            
+            def record_agreed_completion(mapping, gmail_completed, icloud_completed, icloud_update):
+                # Both sides flipped the same way, so just record the new state
+                mapping.last_known_completed = gmail_completed
+                return None
+            
+            reconcile_completion = (
+                keep_completion,
+                push_completion_to_gmail,
+                push_completion_to_icloud,
+                record_agreed_completion,
+            )
             
             for mapping in mappings:
                 task = gmail_tasks_map.get(mapping.gmail_task_id)
                 reminder = icloud_reminders_map.get(mapping.icloud_reminder_uid)
                 
-                if task and reminder:
-                    gmail_completed = task.get("status") == "completed"
-                    icloud_completed = reminder.get("completed", False)
+                # Tasks left out of a delta fetch are unchanged
+                gmail_unchanged = (
+                    task is None
+                    and updated_min is not None
+                    and mapping.gmail_task_list_id == task_list_id
+                )
+                
+                if reminder and (task or gmail_unchanged) and not mapping.gmail_deleted:
                     last_known = mapping.last_known_completed or False
+                    gmail_completed = task.get("status") == "completed" if task else last_known
+                    icloud_completed = reminder.get("completed", False)
                     
                     # Detect which side changed
                     gmail_changed = gmail_completed != last_known
                     icloud_changed = icloud_completed != last_known
                     
-                    if gmail_changed and not icloud_changed:
-                        # Gmail changed, update iCloud
-                        icloud_reminders.update_reminder(
-                            db, mapping.icloud_reminder_uid, completed=gmail_completed
-                        )
-                        mapping.last_known_completed = gmail_completed
-                    elif icloud_changed and not gmail_changed:
-                        # iCloud changed, update Gmail
-                        google_tasks.update_task(
-                            db, mapping.gmail_task_list_id, mapping.gmail_task_id,
-                            status="completed" if icloud_completed else "needsAction"
-                        )
-                        mapping.last_known_completed = icloud_completed
-                    elif gmail_changed and icloud_changed:
-                        # Both changed - prefer completed state (if either is done, mark both done)
-                        final_state = gmail_completed or icloud_completed
-                        if gmail_completed != final_state:
-                            google_tasks.update_task(
-                                db, mapping.gmail_task_list_id, mapping.gmail_task_id,
-                                status="completed" if final_state else "needsAction"
-                            )
-                        if icloud_completed != final_state:
-                            icloud_reminders.update_reminder(
-                                db, mapping.icloud_reminder_uid, completed=final_state
-                            )
-                        mapping.last_known_completed = final_state
-                    
-                    # Also sync title/notes from Gmail to iCloud
-                    icloud_reminders.update_reminder(
-                        db, mapping.icloud_reminder_uid,
-                        summary=task.get("title"),
-                        description=task.get("notes", "")
+                    icloud_update = {}
+                    icloud_state = reconcile_completion[(gmail_changed << 1) | icloud_changed](
+                        mapping, gmail_completed, icloud_completed, icloud_update
                     )
+                    
+                    # Also sync title/notes from Gmail to iCloud, when they differ
+                    if task:
+                        title = task.get("title")
+                        notes = task.get("notes", "")
+                        if title != reminder.get("summary"):
+                            icloud_update["summary"] = title
+                        if notes != (reminder.get("description") or ""):
+                            icloud_update["description"] = notes
+                    
+                    if icloud_update:
+                        pending_icloud_updates.append({"id": mapping.icloud_reminder_uid, **icloud_update})
+                        pending_icloud_states.append((mapping, icloud_state))
+                        mapping.last_synced_hash = None
                     tasks_synced += 1
             
+            icloud_results = icloud_reminders.batch_update_reminders(db, pending_icloud_updates)
+            for (mapping, completed), saved in zip(pending_icloud_states, icloud_results):
+                if not saved:
+                    sync_clean = False
+                elif completed is not None:
+                    mapping.last_known_completed = completed
+            
+            gmail_results = google_tasks.batch_update_tasks(db, pending_gmail_updates, service=service)
+            for (mapping, completed), result in zip(pending_gmail_states, gmail_results):
+                if result is None:
+                    sync_clean = False
+                elif result.get("deleted"):
+                    mapping.gmail_deleted = True
+                else:
+                    mapping.last_known_completed = completed
+            
             db.commit()
             
             # Handle unmapped items (new on either side)
-            mapped_gmail_ids = {m.gmail_task_id for m in mappings}
-            mapped_icloud_ids = {m.icloud_reminder_uid for m in mappings}
-            
             # New Gmail tasks -> create in iCloud
-            for task_id, task in gmail_tasks_map.items():
-                if task_id not in mapped_gmail_ids:
-                    mapping = sync_gmail_task_to_icloud(db, task, task_list_id, calendar_id)
-                    if mapping:
-                        mapping.last_known_completed = task.get("status") == "completed"
-                        tasks_synced += 1
+            new_rows = []
+            for task in new_gmail_tasks:
+                row = sync_gmail_task_to_icloud(db, task, task_list_id, calendar_id, known_mappings=mappings_by_gmail)
+                if row:
+                    row["last_known_completed"] = task.get("status") == "completed"
+                    new_rows.append(row)
+                    tasks_synced += 1
+                else:
+                    sync_clean = False
+            upsert_mappings(db, new_rows)
+            db.commit()
             
             # New iCloud reminders -> create in Gmail
-            for reminder_id, reminder in icloud_reminders_map.items():
-                if reminder_id not in mapped_icloud_ids:
-                    mapping = sync_icloud_reminder_to_gmail(db, reminder, calendar_id, task_list_id)
-                    if mapping:
-                        mapping.last_known_completed = reminder.get("completed", False)
-                        reminders_synced += 1
+            new_rows = []
+            results = sync_icloud_reminders_to_gmail(
+                db, new_icloud_reminders, calendar_id, task_list_id,
+                service=service, known_mappings=mappings_by_icloud
+            )
+            for reminder, row in zip(new_icloud_reminders, results):
+                if row:
+                    row["last_known_completed"] = reminder.get("completed", False)
+                    new_rows.append(row)
+                    reminders_synced += 1
+                else:
+                    sync_clean = False
+            upsert_mappings(db, new_rows)
         
         elif direction == SyncDirection.GMAIL_TO_ICLOUD:
-            for task in gmail_tasks_map.values():
-                mapping = sync_gmail_task_to_icloud(db, task, task_list_id, calendar_id)
-                if mapping:
-                    mapping.last_known_completed = task.get("status") == "completed"
+            rows = []
+            for task in chain(gmail_tasks_map.values(), new_gmail_tasks):
+                row = sync_gmail_task_to_icloud(db, task, task_list_id, calendar_id, known_mappings=mappings_by_gmail)
+                if row:
+                    row["last_known_completed"] = task.get("status") == "completed"
+                    rows.append(row)
                     tasks_synced += 1
+                else:
+                    sync_clean = False
+            upsert_mappings(db, rows)
         
         elif direction == SyncDirection.ICLOUD_TO_GMAIL:
-            for reminder in icloud_reminders_map.values():
-                mapping = sync_icloud_reminder_to_gmail(db, reminder, calendar_id, task_list_id)
-                if mapping:
-                    mapping.last_known_completed = reminder.get("completed", False)
+            rows = []
+            reminders = list(chain(icloud_reminders_map.values(), new_icloud_reminders))
+            results = sync_icloud_reminders_to_gmail(
+                db, reminders, calendar_id, task_list_id,
+                service=service, known_mappings=mappings_by_icloud
+            )
+            for reminder, row in zip(reminders, results):
+                if row:
+                    row["last_known_completed"] = reminder.get("completed", False)
+                    rows.append(row)
                     reminders_synced += 1
+            upsert_mappings(db, rows)
         
         db.commit()
         sync_log.status = SyncStatus.SUCCESS
         
+        # Only advance the delta cursor when no item failed
+        if direction != SyncDirection.ICLOUD_TO_GMAIL and sync_clean:
+            set_setting(db, _delta_cursor_key(task_list_id), next_updated_min)
+        
     except Exception as e:
+        # Discard the unfinished phase so the failure itself can be recorded
+        db.rollback()
         error_message = str(e)
         sync_log.status = SyncStatus.FAILED
         sync_log.error_message = error_message
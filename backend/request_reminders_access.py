@@ -2,6 +2,7 @@
 """Script to request Reminders access on macOS."""
 
 import sys
+import time
 from threading import Event
 from EventKit import EKEventStore, EKEntityTypeReminder
 from Foundation import NSRunLoop, NSDate
@@ -30,11 +31,12 @@ event_store.requestAccessToEntityType_completion_(EKEntityTypeReminder, completi
 
 # Run the run loop to allow the dialog to appear
 print("Waiting for permission dialog...")
-timeout = 60
-while not done.is_set() and timeout > 0:
-    # Process pending events (allows system dialogs to appear)
-    NSRunLoop.currentRunLoop().runUntilDate_(NSDate.dateWithTimeIntervalSinceNow_(1.0))
-    timeout -= 1
+deadline = time.monotonic() + 60
+run_loop = NSRunLoop.currentRunLoop()
+while not done.is_set() and time.monotonic() < deadline:
+    # Process pending events (allows system dialogs to appear) in short
+    # slices so we return as soon as the user answers
+    run_loop.runUntilDate_(NSDate.dateWithTimeIntervalSinceNow_(0.05))
 
 if not done.is_set():
     print("Timeout waiting for response")
@@ -1,4 +1,6 @@
 const API_BASE = '/api';
+// How long the Sync Now button waits for a background sync to finish
+const SYNC_WAIT_TIMEOUT_MS = 10 * 60 * 1000;
 
 // ============ Utilities ============
 
@@ -89,7 +91,7 @@ async function loadStatus() {
             container.style.display = 'block';
             
             const info = status.last_sync;
-            let statusText = info.status === 'success' ? '✅ Success' : '❌ Failed';
+            let statusText = { success: '✅ Success', running: '⏳ Running' }[info.status] || '❌ Failed';
             let details = `${statusText} - ${info.tasks_synced} tasks, ${info.reminders_synced} reminders synced`;
             
             if (info.error_message) {
@@ -175,7 +177,15 @@ async function triggerSync() {
     
     try {
         const result = await apiCall('/sync/trigger', 'POST');
-        showNotification(result.message, result.message.includes('success') ? 'success' : 'error');
+        showNotification(result.message, 'info');
+        loadSyncLogs();
+        
+        const log = await waitForSync(result.sync_id);
+        if (log.status === 'success') {
+            showNotification('Sync completed successfully', 'success');
+        } else {
+            showNotification(`Sync failed: ${log.error_message}`, 'error');
+        }
         loadStatus();
         loadSyncLogs();
     } catch (error) {
@@ -186,6 +196,23 @@ async function triggerSync() {
     }
 }
 
+async function waitForSync(syncId) {
+    // Syncs run in the background; poll the logs until this one finishes
+    const deadline = Date.now() + SYNC_WAIT_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const logs = await apiCall('/sync/logs?limit=10');
+        const log = logs.find(entry => entry.id === syncId);
+        if (!log) {
+            throw new Error('sync is no longer in the recent history');
+        }
+        if (log.status !== 'running') {
+            return log;
+        }
+    }
+    throw new Error('timed out waiting for the sync to finish');
+}
+
 async function startScheduler() {
     try {
         await apiCall('/scheduler/start', 'POST');
@@ -222,7 +249,7 @@ async function loadSyncLogs() {
                 <div class="sync-log-info">
                     <span class="sync-log-time">${formatDate(log.started_at)}</span>
                     <span class="sync-log-details">
-                        ${log.status === 'success' ? '✅' : '❌'} 
+                        ${{ success: '✅', running: '⏳' }[log.status] || '❌'} 
                         ${log.tasks_synced} tasks, ${log.reminders_synced} reminders
                         (${log.direction.replace('_', ' → ')})
                     </span>